@@ -1,54 +1,85 @@
 # agent_registry.py
 
-from typing import Dict
+from typing import Dict, List
+import numpy as np
 from shared_types import Ticket
 
 
 class AgentRegistry:
 
     def __init__(self):
-        self.agents: Dict[str, dict] = {
-            "agent-1": {
-                "skills": {"Billing": 0.9, "Technical": 0.2, "Legal": 0.1},
-                "capacity": 5,
-                "load": 0
-            },
-            "agent-2": {
-                "skills": {"Billing": 0.3, "Technical": 0.9, "Legal": 0.2},
-                "capacity": 5,
-                "load": 0
-            },
-            "agent-3": {
-                "skills": {"Billing": 0.4, "Technical": 0.4, "Legal": 0.9},
-                "capacity": 3,
-                "load": 0
-            }
-        }
+        # Structure-of-arrays layout: one row per agent, one column per category.
+        self.ids = ["agent-1", "agent-2", "agent-3"]
+        self.cat_idx: Dict[str, int] = {"Billing": 0, "Technical": 1, "Legal": 2}
+
+        self.skills = np.array(
+            [
+                [0.9, 0.2, 0.1],   # agent-1
+                [0.3, 0.9, 0.2],   # agent-2
+                [0.4, 0.4, 0.9],   # agent-3
+            ],
+            dtype=np.float32,
+        )
+        self.capacity = np.array([5, 5, 3])
+        self.load = np.zeros(len(self.ids), dtype=int)
+
+        self._agent_idx = {agent_id: i for i, agent_id in enumerate(self.ids)}
+
+    def _skill(self, category) -> np.ndarray:
+        cat = self.cat_idx.get(category)
+        if cat is None:
+            return np.zeros(len(self.ids), dtype=np.float32)
+        return self.skills[:, cat]
+
+    def _score(self, skill: np.ndarray) -> np.ndarray:
+        # Full agents get -1 so they lose even to a zero-skill available agent
+        return np.where(self.load < self.capacity, skill * (1 - self.load / self.capacity), -1)
 
     def assign(self, ticket: Ticket) -> str:
-        best_agent = None
-        best_score = -1
+        score = self._score(self._skill(ticket.category))
+        best = int(score.argmax())
+
+        if score[best] < 0:
+            return "queued"
+
+        self.load[best] += 1
+        return self.ids[best]
 
-        for agent_id, data in self.agents.items():
+    def assign_many(self, tickets: List[Ticket]) -> List[str]:
+        """
+        Jointly assign a burst of tickets: repeatedly take the best remaining
+        (ticket, agent) pair from the (T, A) score matrix, then re-score
+        with the updated load. When there are fewer free slots than tickets,
+        only the most urgent ones (arrival order breaking ties) take part;
+        the rest get "queued".
+        """
+        results = ["queued"] * len(tickets)
+        if not tickets:
+            return results
 
-            if data["load"] >= data["capacity"]:
-                continue  # skip full agents
+        skills = np.stack([self._skill(t.category) for t in tickets])   # (T, A)
 
-            skill_score = data["skills"].get(ticket.category, 0)
-            availability = 1 - (data["load"] / data["capacity"])
+        # Any free agent can take any ticket, so the free slots decide how
+        # many tickets are served; urgency decides which.
+        free = int(np.clip(self.capacity - self.load, 0, None).sum())
+        by_urgency = sorted(range(len(tickets)), key=lambda i: -tickets[i].urgency_score)
+        pending = np.zeros(len(tickets), dtype=bool)
+        pending[by_urgency[:free]] = True
 
-            score = skill_score * availability
+        for _ in range(int(pending.sum())):
+            score = self._score(skills)
+            score[~pending] = -2
+            t, a = np.unravel_index(int(score.argmax()), score.shape)
 
-            if score > best_score:
-                best_score = score
-                best_agent = agent_id
+            if score[t, a] < 0:
+                break
 
-        if best_agent:
-            self.agents[best_agent]["load"] += 1
-            return best_agent
+            self.load[a] += 1
+            pending[t] = False
+            results[t] = self.ids[a]
 
-        return "queued"
+        return results
 
     def release(self, agent_id: str):
-        if agent_id in self.agents:
-            self.agents[agent_id]["load"] -= 1
\ No newline at end of file
+        if agent_id in self._agent_idx:
+            self.load[self._agent_idx[agent_id]] -= 1
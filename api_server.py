@@ -1,10 +1,9 @@
 # api_server.py  ──  Member B owns this file
-# FastAPI server: POST /ticket, GET /health
+# FastAPI server: POST /ticket, GET /health, GET /tickets/recent
 # Uses import guards so it runs even before Member A / C commit their code.
 
 import os
-import json
-import uuid
+import time
 import httpx
 import asyncio
 from dataclasses import asdict
@@ -14,22 +13,32 @@ from fastapi import FastAPI, HTTPException
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 
-from shared_types import Ticket
+from shared_types import Ticket, pack, unpack
 from config import (
     REDIS_URL,
+    REDIS_MAX_CONNECTIONS,
+    REDIS_HEALTH_CHECK_INTERVAL,
+    REDIS_POOL_TIMEOUT_SECONDS,
     REDIS_QUEUE_KEY,
+    RECENT_TICKETS_KEY,
+    RECENT_TICKETS_MAX,
+    REDIS_PUSH_BATCH_MAX,
+    REDIS_PUSH_BATCH_WINDOW_MS,
     URGENCY_WEBHOOK_THRESHOLD,
     WEBHOOK_URL,
+    API_NODE_ID,
+    API_WORKERS,
 )
 
 # ── Import Guards ─────────────────────────────────────────────────────────────
 # These allow the API to run solo from Hour 0:30 without waiting for A or C.
 
 try:
-    from ml_engine import classify, urgency_score
+    from ml_engine import classify, urgency_score, is_fallback
 except ImportError:
     classify = lambda t: "Technical"
     urgency_score = lambda t: 0.5
+    is_fallback = lambda: bool(os.getenv("MODEL_FALLBACK"))
 
 try:
     from router import enqueue, assign_agent, get_queue_depth
@@ -47,19 +56,149 @@ except ImportError:
     _redis_client = None
     REDIS_AVAILABLE = False
 
+# ── Ticket IDs ────────────────────────────────────────────────────────────────
+# Snowflake-style 64-bit time-sorted IDs, hex-encoded to 16 chars:
+# 42 bits of epoch milliseconds | 10-bit node id | 12-bit per-ms sequence.
+# Two processes can only collide if they share a node id, so give each API
+# instance its own API_NODE_ID (0–1023). Uvicorn workers forked from one
+# instance would all inherit it, so with WEB_CONCURRENCY > 1 (or no
+# API_NODE_ID) each process draws a random node id at startup instead
+# (a 1-in-1024 chance per pair of processes to clash).
+_ID_NODE_BITS = 10
+_ID_SEQ_BITS = 12
+_ID_SEQ_MASK = (1 << _ID_SEQ_BITS) - 1
+
+_id_node = (
+    int(API_NODE_ID) if API_NODE_ID is not None and API_WORKERS == 1
+    else int.from_bytes(os.urandom(2), "big")
+) & ((1 << _ID_NODE_BITS) - 1)
+_id_last_ms = -1
+_id_seq = 0
+
+def _next_id() -> str:
+    global _id_last_ms, _id_seq
+    now_ms = time.time_ns() // 1_000_000
+
+    if now_ms > _id_last_ms:
+        _id_last_ms, _id_seq = now_ms, 0
+    else:
+        # Same millisecond (or the clock stepped back): keep counting on the
+        # last timestamp, borrowing the next millisecond once 4096 are used.
+        _id_seq = (_id_seq + 1) & _ID_SEQ_MASK
+        if _id_seq == 0:
+            _id_last_ms += 1
+
+    return f"{_id_last_ms << (_ID_NODE_BITS + _ID_SEQ_BITS) | _id_node << _ID_SEQ_BITS | _id_seq:016x}"
+
+# ── Redis push batcher ────────────────────────────────────────────────────────
+# Concurrent POST /ticket requests are coalesced into a single variadic LPUSH
+# (queue + recent feed + trim) so a burst of N tickets costs one round-trip.
+
+class _PushBatcher:
+    def __init__(self, max_size: int, window_ms: float):
+        self._max_size = max_size
+        self._window_s = window_ms / 1000
+        self._pending: list[tuple[bytes, asyncio.Future]] = []
+        self._timer: asyncio.Task | None = None
+        self._flushes: set[asyncio.Task] = set()
+
+    async def submit(self, payload: bytes) -> None:
+        fut = asyncio.get_running_loop().create_future()
+        self._pending.append((payload, fut))
+
+        if len(self._pending) >= self._max_size:
+            # _timer is only set while the window is still sleeping, so this
+            # never interrupts a flush that is already talking to Redis.
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            # Own task rather than this request's coroutine: a client that
+            # disconnects mid-flush must not cancel the other requests' push.
+            task = asyncio.create_task(self._flush(self._take()))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_after_window())
+
+        await fut
+
+    async def _flush_after_window(self) -> None:
+        await asyncio.sleep(self._window_s)
+        # Submits arriving while this flush awaits Redis start a new window.
+        self._timer = None
+        await self._flush(self._take())
+
+    def _take(self) -> list[tuple[bytes, asyncio.Future]]:
+        batch, self._pending = self._pending, []
+        return batch
+
+    async def _flush(self, batch: list[tuple[bytes, asyncio.Future]]) -> None:
+        if not batch:
+            return
+
+        payloads = [payload for payload, _ in batch]
+        error: BaseException | None = None
+        try:
+            async with _redis_client.pipeline(transaction=False) as pipe:
+                pipe.lpush(REDIS_QUEUE_KEY, *payloads)
+                pipe.lpush(RECENT_TICKETS_KEY, *payloads)
+                pipe.ltrim(RECENT_TICKETS_KEY, 0, RECENT_TICKETS_MAX - 1)
+                await pipe.execute()
+        except Exception as e:
+            error = e
+        except asyncio.CancelledError:
+            error = RuntimeError("ticket push cancelled before Redis confirmed it")
+            raise
+        finally:
+            # Every waiting request is answered, whatever happened above
+            for _, fut in batch:
+                if fut.done():
+                    continue
+                if error is None:
+                    fut.set_result(None)
+                else:
+                    fut.set_exception(error)
+
+_push_batcher = _PushBatcher(REDIS_PUSH_BATCH_MAX, REDIS_PUSH_BATCH_WINDOW_MS)
+
+# ── Webhook HTTP client (one pooled keep-alive client per process) ────────────
+_http_client: httpx.AsyncClient | None = None
+
+def _get_http_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            http2=True,
+            timeout=5.0,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        )
+    return _http_client
+
 # ── Circuit Breaker State (shared with worker via module-level state) ──────────
-# worker.py manages the actual env var; we just read it here for /health
+# worker.py flips the in-process fallback flag; we just read it here for /health
 def _circuit_breaker_state() -> str:
-    return "open" if os.getenv("MODEL_FALLBACK") else "closed"
+    return "open" if is_fallback() else "closed"
 
 # ── App Lifespan ──────────────────────────────────────────────────────────────
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global _redis_client
+    global _redis_client, _http_client
+    _get_http_client()
     if REDIS_AVAILABLE:
         try:
-            _redis_client = aioredis.from_url(REDIS_URL, decode_responses=True)
+            # Raw bytes responses: payloads are MessagePack-encoded, so
+            # skip redis-py's UTF-8 decode pass.
+            # Blocking pool: past the cap, callers wait for a free
+            # connection instead of failing with "Too many connections".
+            pool = aioredis.BlockingConnectionPool.from_url(
+                REDIS_URL,
+                max_connections=REDIS_MAX_CONNECTIONS,
+                timeout=REDIS_POOL_TIMEOUT_SECONDS,
+                health_check_interval=REDIS_HEALTH_CHECK_INTERVAL,
+                socket_keepalive=True,
+            )
+            _redis_client = aioredis.Redis.from_pool(pool)
             await _redis_client.ping()
             print("✅  Redis connected")
         except Exception as e:
@@ -68,6 +207,9 @@ async def lifespan(app: FastAPI):
     yield
     if _redis_client:
         await _redis_client.aclose()
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
 
 app = FastAPI(
     title="SmartSupport Routing Engine",
@@ -111,8 +253,7 @@ async def _fire_webhook(ticket: Ticket, agent_id: str) -> None:
         )
     }
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            await client.post(WEBHOOK_URL, json=payload)
+        await _get_http_client().post(WEBHOOK_URL, json=payload)
     except Exception as e:
         print(f"⚠️  Webhook delivery failed: {e}")
 
@@ -134,13 +275,12 @@ async def create_ticket(req: TicketRequest):
     Phase 1: Returns 200 with fully processed Ticket JSON (sync).
     Phase 2: Returns 202 Accepted immediately; pushes raw payload to Redis.
     """
-    ticket_id = req.id or str(uuid.uuid4())
+    ticket_id = req.id or _next_id()
     ticket = Ticket(id=ticket_id, text=req.text)
 
     # ── Phase 2 path: async broker available ──────────────────────────────────
     if _redis_client is not None:
-        payload = json.dumps({"id": ticket_id, "text": req.text})
-        await _redis_client.lpush(REDIS_QUEUE_KEY, payload)
+        await _push_batcher.submit(pack(ticket))
         return JSONResponse(
             status_code=202,
             content={
@@ -188,9 +328,28 @@ async def health_check():
         circuit_breaker=_circuit_breaker_state(),
     )
 
+# ── GET /tickets/recent ───────────────────────────────────────────────────────
+
+@app.get("/tickets/recent")
+async def recent_tickets():
+    """Most recently submitted tickets, newest first (Phase 2+ only)."""
+    if _redis_client is None:
+        return []
+    raw_list = await _redis_client.lrange(RECENT_TICKETS_KEY, 0, RECENT_TICKETS_MAX - 1)
+    feed = (unpack(r) for r in raw_list if r)
+    return [{"id": t.id, "text": t.text} for t in feed]
+
 # ── Entry Point ───────────────────────────────────────────────────────────────
 
 if __name__ == "__main__":
     import uvicorn
-    from config import API_HOST, API_PORT
-    uvicorn.run("api_server:app", host=API_HOST, port=API_PORT, reload=True)
+    from config import API_HOST, API_PORT, API_WORKERS, DEV_MODE
+    uvicorn.run(
+        "api_server:app",
+        host=API_HOST,
+        port=API_PORT,
+        loop="uvloop",
+        http="httptools",
+        workers=API_WORKERS,
+        reload=DEV_MODE,
+    )
@@ -8,14 +8,30 @@ import os
 REDIS_URL: str = os.getenv("REDIS_URL", "redis://redis:6379")
 REDIS_QUEUE_KEY: str = "tickets_queue"
 REDIS_LOCK_TTL_SECONDS: int = 30           # SETNX lock expiry
+LOCK_CACHE_MAX: int = 4096                  # locked ids remembered in-process
+REDIS_MAX_CONNECTIONS: int = 64             # per-process pool cap (callers wait…)
+REDIS_POOL_TIMEOUT_SECONDS: float = 5.0     # …up to this long for a free connection
+REDIS_HEALTH_CHECK_INTERVAL: int = 30       # seconds idle before a PING on reuse
+RECENT_TICKETS_KEY: str = "recent_tickets"  # dashboard feed (newest first)
+RECENT_TICKETS_MAX: int = 30
+WORKER_BATCH_SIZE: int = 100                # tickets drained per BLMPOP
+WORKER_CONCURRENCY: int = int(os.getenv("WORKER_CONCURRENCY", str(os.cpu_count() or 4)))
+WORKER_SHUTDOWN_TIMEOUT_SECONDS: float = 10.0  # grace period for in-flight batches
+REDIS_PUSH_BATCH_MAX: int = 100             # coalesce up to N ticket pushes…
+REDIS_PUSH_BATCH_WINDOW_MS: float = 5.0     # …arriving within this window
 
 # ── API ───────────────────────────────────────────────────────────────────────
 API_HOST: str = os.getenv("API_HOST", "0.0.0.0")
 API_PORT: int = int(os.getenv("API_PORT", "8000"))
+API_WORKERS: int = int(os.getenv("WEB_CONCURRENCY", "1"))
+DEV_MODE: bool = os.getenv("DEV") == "1"       # enables uvicorn auto-reload
+API_NODE_ID: str | None = os.getenv("API_NODE_ID")   # 0–1023, unique per API instance
+LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")  # DEBUG adds per-ticket lines
 
 # ── Webhook ───────────────────────────────────────────────────────────────────
 WEBHOOK_URL: str | None = os.getenv("WEBHOOK_URL")          # Slack/Discord
 URGENCY_WEBHOOK_THRESHOLD: float = 0.8
+WEBHOOK_FLUSH_WINDOW_SECONDS: float = 0.1   # urgent alerts within this share one POST
 
 # ── Circuit Breaker ───────────────────────────────────────────────────────────
 CIRCUIT_BREAKER_LATENCY_MS: float = 500.0   # open circuit if latency > this
@@ -29,3 +45,4 @@ MODEL_FALLBACK_ENV_VAR: str = "MODEL_FALLBACK"
 # ── Storm Detection ───────────────────────────────────────────────────────────
 STORM_WINDOW_SECONDS: int = 300             # 5 minutes
 STORM_TICKET_THRESHOLD: int = 10
+STORM_FLUSH_WINDOW_SECONDS: float = 0.1     # coalesce a burst into one master incident
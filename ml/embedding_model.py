@@ -1,21 +1,108 @@
 # ml/embedding_model.py
 
+import os
 from sentence_transformers import SentenceTransformer
+import numpy as np
 import torch
 
+# onnxruntime is optional: when it is installed and an exported graph exists
+# (see export_onnx below), embeddings are served from ONNX Runtime instead
+# of the PyTorch eager path.
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
+
+_MODEL_NAME = "all-MiniLM-L6-v2"
+ONNX_MODEL_PATH = os.getenv("EMBEDDING_ONNX_PATH", "embeddings.onnx")
+
 _device = "cuda" if torch.cuda.is_available() else "cpu"
 
 _embedding_model = SentenceTransformer(
-    "all-MiniLM-L6-v2",
+    _MODEL_NAME,
     device=_device
 )
 
+_onnx_session = None
+if ort is not None and os.path.exists(ONNX_MODEL_PATH):
+    _sess_options = ort.SessionOptions()
+    _sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    _onnx_session = ort.InferenceSession(
+        ONNX_MODEL_PATH, _sess_options, providers=["CPUExecutionProvider"]
+    )
+
+# FP16 on GPU, int8 dynamic quantisation of the Linear layers on CPU
+# (only when the PyTorch model is the one actually serving embeddings)
+if _device == "cuda":
+    _embedding_model.half()
+elif _onnx_session is None:
+    torch.quantization.quantize_dynamic(
+        _embedding_model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+    )
+
+# Embeddings are L2-normalised and quantised to int8 (scale 127), so each
+# 384-D vector is 384 bytes instead of 1.5 KB of float32.
+EMBEDDING_SCALE = 127
+
+
+def _onnx_encode(text: str) -> np.ndarray:
+    tokens = _embedding_model.tokenizer(
+        text,
+        truncation=True,
+        max_length=_embedding_model.max_seq_length,
+        return_tensors="np",
+    )
+    mask = tokens["attention_mask"].astype(np.int64)
+
+    (hidden,) = _onnx_session.run(
+        ["last_hidden_state"],
+        {"input_ids": tokens["input_ids"].astype(np.int64), "attention_mask": mask},
+    )
+
+    # Mean pooling over real tokens, as the SentenceTransformer Pooling layer does
+    weights = mask[..., None].astype(np.float32)
+    return (hidden * weights).sum(axis=1)[0] / max(weights.sum(), 1.0)
 
-def get_embedding(text: str) -> list:
+
+def get_embedding(text: str) -> bytes:
     if not text.strip():
-        return []
+        return b""
+
+    if _onnx_session is not None:
+        embedding = _onnx_encode(text)
+    else:
+        with torch.inference_mode():
+            embedding = _embedding_model.encode(text)
+
+    embedding = np.asarray(embedding, dtype=np.float32)
+    embedding /= np.linalg.norm(embedding) + 1e-12
+
+    return (embedding * EMBEDDING_SCALE).round().astype(np.int8).tobytes()
+
+
+def export_onnx(path: str = ONNX_MODEL_PATH) -> None:
+    """One-off export of the MiniLM encoder to ONNX with dynamic batch/seq axes."""
+    # Export from a fresh FP32 copy: the served model may already be quantised.
+    model = SentenceTransformer(_MODEL_NAME, device="cpu")
+    encoder = model[0].auto_model.eval()
+    sample = model.tokenizer("export sample", return_tensors="pt")
+
+    dynamic = {0: "batch", 1: "seq"}
+    torch.onnx.export(
+        encoder,
+        (sample["input_ids"], sample["attention_mask"]),
+        path,
+        input_names=["input_ids", "attention_mask"],
+        output_names=["last_hidden_state"],
+        dynamic_axes={
+            "input_ids": dynamic,
+            "attention_mask": dynamic,
+            "last_hidden_state": dynamic,
+        },
+        opset_version=14,
+    )
 
-    with torch.no_grad():
-        embedding = _embedding_model.encode(text)
 
-    return list(embedding)
+if __name__ == "__main__":
+    export_onnx()
+    print(f"Exported {_MODEL_NAME} to {ONNX_MODEL_PATH}")
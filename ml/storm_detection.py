@@ -5,14 +5,33 @@ import uuid
 from shared_types import Ticket
 
 
-def cosine_similarity(a, b):
-    a = np.array(a)
-    b = np.array(b)
+# get_embedding L2-normalises before scaling to int8, so every stored
+# embedding already has (up to rounding) this norm — no need to recompute it.
+EMBEDDING_NORM = 127.0
+
+SIMILARITY_THRESHOLD = 0.9
+MIN_SIMILAR_PAIRS = 10
+
+
+def _as_vector(e) -> np.ndarray:
+    if isinstance(e, (bytes, bytearray)):
+        return np.frombuffer(e, dtype=np.int8).astype(np.float32)
+    return np.asarray(e, dtype=np.float32)
+
+
+def cosine_similarity(a, b, norm_a: float | None = None, norm_b: float | None = None) -> float:
+    a = _as_vector(a)
+    b = _as_vector(b)
 
     if len(a) == 0 or len(b) == 0:
         return 0.0
 
-    return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
+    if norm_a is None:
+        norm_a = float(np.linalg.norm(a))
+    if norm_b is None:
+        norm_b = float(np.linalg.norm(b))
+
+    return float(np.dot(a, b)) / (norm_a * norm_b + 1e-12)
 
 
 def is_storm(recent_tickets: list[Ticket]) -> bool:
@@ -24,15 +43,19 @@ def is_storm(recent_tickets: list[Ticket]) -> bool:
     if len(embeddings) <= 10:
         return False
 
-    count_similar = 0
+    # Embeddings are int8 bytes (L2-normalised, scale 127). Upcast to float32
+    # so the matmul runs as a BLAS SGEMM (NumPy's integer matmul has no BLAS
+    # path). It is still exact: the largest dot product, 384·127² ≈ 6.2M, is
+    # below 2²⁴. Then rescale back to cosine similarity.
+    E = np.frombuffer(b"".join(embeddings), dtype=np.int8)
+    E = E.reshape(len(embeddings), -1).astype(np.float32)
+    count_similar = np.count_nonzero(np.triu(_similarity(E), k=1) > SIMILARITY_THRESHOLD)
+
+    return bool(count_similar >= MIN_SIMILAR_PAIRS)
 
-    for i in range(len(embeddings)):
-        for j in range(i + 1, len(embeddings)):
-            sim = cosine_similarity(embeddings[i], embeddings[j])
-            if sim > 0.9:
-                count_similar += 1
 
-    return count_similar >= 10
+def _similarity(E: np.ndarray) -> np.ndarray:
+    return (E @ E.T) / (EMBEDDING_NORM * EMBEDDING_NORM)
 
 
 def create_master_incident(tickets: list[Ticket]) -> str:
@@ -2,12 +2,16 @@
 
 import time
 import os
+import asyncio
+import hashlib
 from shared_types import Category
 
 from ml.baseline_model import baseline_classify, baseline_urgency_score
 from ml.transformer_model import (
     transformer_classify,
+    transformer_classify_batch,
     transformer_urgency_score,
+    transformer_urgency_score_batch,
 )
 from ml.embedding_model import get_embedding as _get_embedding
 from ml.storm_detection import (
@@ -17,18 +21,76 @@ from ml.storm_detection import (
 
 _last_latency_ms = 0.0
 
+# Model fallback flag, flipped in-process by the worker's circuit breaker via
+# set_fallback(). Seeded once from MODEL_FALLBACK so it can be forced at startup.
+_fallback: bool = bool(os.getenv("MODEL_FALLBACK"))
+
 VALID_CATEGORIES = {"Billing", "Technical", "Legal"}
 
+# Micro-batching: concurrent async callers are collected for up to
+# BATCH_WINDOW_MS (or BATCH_MAX_SIZE texts) and run as one forward pass.
+BATCH_MAX_SIZE = 32
+BATCH_WINDOW_MS = 10.0
+
+# Transformer results memoised by a 16-byte text digest. Storms are made of
+# repeated texts, so repeats skip the forward pass entirely. The baseline
+# fallback path is never cached, keeping both paths independent.
+CACHE_MAX_SIZE = 10_000
+_classify_cache: dict[bytes, str] = {}
+_urgency_cache: dict[bytes, float] = {}
+
+
+def _cache_key(text: str) -> bytes:
+    return hashlib.blake2b(text.encode(), digest_size=16).digest()
+
+
+def _cache_put(cache: dict, key: bytes, value) -> None:
+    if len(cache) >= CACHE_MAX_SIZE:
+        cache.pop(next(iter(cache)))  # evict oldest entry
+    cache[key] = value
+
+
+def _cached(text: str, cache: dict, fn):
+    key = _cache_key(text)
+    result = cache.get(key)
+    if result is None:
+        result = fn(text)
+        _cache_put(cache, key, result)
+    return result
+
+
+def _cached_batch(texts: list[str], cache: dict, batch_fn) -> list:
+    keys = [_cache_key(text) for text in texts]
+    results = [cache.get(key) for key in keys]
+    misses = [i for i, r in enumerate(results) if r is None]
+
+    if misses:
+        computed = batch_fn([texts[i] for i in misses])
+        for i, value in zip(misses, computed):
+            results[i] = value
+            _cache_put(cache, keys[i], value)
+
+    return results
+
+
+def set_fallback(value: bool) -> None:
+    global _fallback
+    _fallback = value
+
+
+def is_fallback() -> bool:
+    return _fallback
+
 
 def classify(text: str) -> Category:
     global _last_latency_ms
 
     start = time.perf_counter()
 
-    if os.getenv("MODEL_FALLBACK"):
+    if _fallback:
         result = baseline_classify(text)
     else:
-        result = transformer_classify(text)
+        result = _cached(text, _classify_cache, transformer_classify)
 
     _last_latency_ms = (time.perf_counter() - start) * 1000
 
@@ -43,10 +105,10 @@ def urgency_score(text: str) -> float:
 
     start = time.perf_counter()
 
-    if os.getenv("MODEL_FALLBACK"):
+    if _fallback:
         score = baseline_urgency_score(text)
     else:
-        score = transformer_urgency_score(text)
+        score = _cached(text, _urgency_cache, transformer_urgency_score)
 
     _last_latency_ms = (time.perf_counter() - start) * 1000
 
@@ -54,7 +116,100 @@ def urgency_score(text: str) -> float:
     return score
 
 
-def get_embedding(text: str) -> list:
+def classify_batch(texts: list[str]) -> list[Category]:
+    global _last_latency_ms
+
+    start = time.perf_counter()
+
+    if _fallback:
+        results = [baseline_classify(text) for text in texts]
+    else:
+        results = _cached_batch(texts, _classify_cache, transformer_classify_batch)
+
+    # Per-ticket latency, so the circuit breaker thresholds still apply.
+    _last_latency_ms = (time.perf_counter() - start) * 1000 / max(len(texts), 1)
+
+    return [r if r in VALID_CATEGORIES else "Technical" for r in results]
+
+
+def urgency_score_batch(texts: list[str]) -> list[float]:
+    global _last_latency_ms
+
+    start = time.perf_counter()
+
+    if _fallback:
+        scores = [baseline_urgency_score(text) for text in texts]
+    else:
+        scores = _cached_batch(texts, _urgency_cache, transformer_urgency_score_batch)
+
+    _last_latency_ms = (time.perf_counter() - start) * 1000 / max(len(texts), 1)
+
+    return [max(0.0, min(1.0, float(s))) for s in scores]
+
+
+class _BatchRunner:
+    """Coalesce concurrent single-text submissions into batched calls."""
+
+    def __init__(self, batch_fn, max_size: int, window_ms: float):
+        self._batch_fn = batch_fn
+        self._max_size = max_size
+        self._window_s = window_ms / 1000
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+
+    async def submit(self, text: str):
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+
+        fut = loop.create_future()
+        await self._queue.put((text, fut))
+        return await fut
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        while True:
+            items = [await self._queue.get()]
+            deadline = loop.time() + self._window_s
+
+            while len(items) < self._max_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    items.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            texts = [text for text, _ in items]
+            try:
+                results = await loop.run_in_executor(None, self._batch_fn, texts)
+            except Exception as e:
+                for _, fut in items:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+
+            for (_, fut), result in zip(items, results):
+                if not fut.done():
+                    fut.set_result(result)
+
+
+_classify_runner = _BatchRunner(classify_batch, BATCH_MAX_SIZE, BATCH_WINDOW_MS)
+_urgency_runner = _BatchRunner(urgency_score_batch, BATCH_MAX_SIZE, BATCH_WINDOW_MS)
+
+
+async def classify_async(text: str) -> Category:
+    return await _classify_runner.submit(text)
+
+
+async def urgency_score_async(text: str) -> float:
+    return await _urgency_runner.submit(text)
+
+
+def get_embedding(text: str) -> bytes:
     global _last_latency_ms
 
     start = time.perf_counter()
@@ -1,25 +1,69 @@
 # router.py
 
-import heapq
 import time
+import numpy as np
 from collections import deque
 from typing import Optional
 from shared_types import Ticket
 from agent_registry import AgentRegistry
 
 # PRIORITY QUEUE
-_queue = []
-_counter = 0 
+class PriorityQueue:
+    """
+    Bucket queue over urgency ∈ [0, 1]: one FIFO deque per 0.01 of urgency.
+    push is O(1); pop scans down from the highest non-empty bucket, which is
+    amortised O(1). FIFO inside a bucket gives the same tie-break as the old
+    insertion counter; urgencies within the same 0.01 step pop in arrival order.
+    """
+
+    BUCKETS = 100
+
+    def __init__(self):
+        self._buckets: list[deque] = [deque() for _ in range(self.BUCKETS + 1)]
+        self._top = -1      # highest possibly non-empty bucket
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def push(self, ticket: Ticket) -> None:
+        b = min(max(int(ticket.urgency_score * self.BUCKETS), 0), self.BUCKETS)
+        self._buckets[b].append(ticket)
+        self._size += 1
+        if b > self._top:
+            self._top = b
+
+    def pop(self) -> Optional[Ticket]:
+        buckets = self._buckets
+        while self._top >= 0 and not buckets[self._top]:
+            self._top -= 1
+        if self._top < 0:
+            return None
+        self._size -= 1
+        return buckets[self._top].popleft()
+
+    def pop_many(self, n: int) -> list[Ticket]:
+        out: list[Ticket] = []
+        buckets = self._buckets
+        while len(out) < n and self._top >= 0:
+            bucket = buckets[self._top]
+            while bucket and len(out) < n:
+                out.append(bucket.popleft())
+            if not bucket:
+                self._top -= 1
+        self._size -= len(out)
+        return out
+
+_queue = PriorityQueue()
 
 def enqueue(ticket: Ticket) -> None:
-    global _counter
-    heapq.heappush(_queue, (-ticket.urgency_score, _counter, ticket))
-    _counter += 1
+    _queue.push(ticket)
 
 def dequeue() -> Optional[Ticket]:
-    if not _queue:
-        return None
-    return heapq.heappop(_queue)[2]
+    return _queue.pop()
+
+def dequeue_batch(n: int) -> list[Ticket]:
+    return _queue.pop_many(n)
 
 def get_queue_depth() -> int:
     return len(_queue)
@@ -30,16 +74,55 @@ registry = AgentRegistry()
 def assign_agent(ticket: Ticket) -> str:
     return registry.assign(ticket)
 
+def assign_agents(tickets: list[Ticket]) -> list[str]:
+    return registry.assign_many(tickets)
+
 # STORM WINDOW DETECTION
-_recent_tickets = deque(maxlen=200)
+# Fixed-size ring buffer of arrival timestamps (oldest at _storm_head).
+# Expired entries are found with a binary search instead of a pop loop,
+# and no Ticket references are retained.
+# Timestamps are integer time.monotonic_ns() readings.
 STORM_WINDOW_SECONDS = 300  
+STORM_WINDOW_NS = STORM_WINDOW_SECONDS * 1_000_000_000
 STORM_THRESHOLD = 10
+_STORM_BUFFER_SIZE = 200
+
+_storm_ts = np.empty(_STORM_BUFFER_SIZE, dtype=np.int64)
+_storm_head = 0
+_storm_count = 0
+
+def check_storm_window(ticket: Optional[Ticket] = None, now_ns: Optional[int] = None) -> bool:
+    """
+    Record one arrival and report whether the window holds a storm. The
+    ticket itself is not needed (only its arrival time is kept). now_ns lets
+    async callers pass one clock reading for a whole batch (e.g. derived
+    from loop.time(), which is on the same monotonic clock).
+    """
+    global _storm_head, _storm_count
+    now = time.monotonic_ns() if now_ns is None else now_ns
+
+    if _storm_count < _STORM_BUFFER_SIZE:
+        _storm_ts[(_storm_head + _storm_count) % _STORM_BUFFER_SIZE] = now
+        _storm_count += 1
+    else:
+        _storm_ts[_storm_head] = now   # overwrite the oldest
+        _storm_head = (_storm_head + 1) % _STORM_BUFFER_SIZE
+
+    # Pruning can only shrink the count, so light traffic skips it entirely.
+    # Stale entries left behind are dropped on the next call that prunes.
+    if _storm_count <= STORM_THRESHOLD:
+        return False
 
-def check_storm_window(ticket: Ticket) -> bool:
-    now = time.time()
-    _recent_tickets.append((now, ticket))
+    # Entries older than the window form a prefix of the in-order buffer,
+    # which is at most two slices when it wraps around.
+    cutoff = now - STORM_WINDOW_NS
+    end = _storm_head + _storm_count
+    first = _storm_ts[_storm_head:min(end, _STORM_BUFFER_SIZE)]
+    expired = int(np.searchsorted(first, cutoff, side="left"))
+    if expired == len(first) and end > _STORM_BUFFER_SIZE:
+        expired += int(np.searchsorted(_storm_ts[:end - _STORM_BUFFER_SIZE], cutoff, side="left"))
 
-    while _recent_tickets and now - _recent_tickets[0][0] > STORM_WINDOW_SECONDS:
-        _recent_tickets.popleft()
+    _storm_head = (_storm_head + expired) % _STORM_BUFFER_SIZE
+    _storm_count -= expired
 
-    return len(_recent_tickets) > STORM_THRESHOLD
\ No newline at end of file
+    return _storm_count > STORM_THRESHOLD
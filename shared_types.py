@@ -2,14 +2,35 @@
 from dataclasses import dataclass
 from typing import Literal, Optional
 
+import msgpack
+
+__all__ = ["Ticket", "Category", "pack", "unpack", "unpack_id_text"]
+
 Category = Literal['Billing', 'Technical', 'Legal']
 
-@dataclass
+@dataclass(slots=True)
 class Ticket:
     id: str
     text: str
     category: Optional[Category]  = None
     urgency_score: float          = 0.0   # S ∈ [0,1]
-    embedding: Optional[list]     = None   # filled by Member A
+    embedding: Optional[bytes]    = None   # int8, filled by Member A
     is_duplicate: bool            = False
     master_incident_id: Optional[str] = None
+
+
+# Wire format for Redis: a MessagePack array in field order. Smaller and
+# cheaper to build than a map keyed by field name.
+def pack(t: Ticket) -> bytes:
+    return msgpack.packb(
+        (t.id, t.text, t.category, t.urgency_score, t.embedding, t.is_duplicate, t.master_incident_id),
+        use_bin_type=True,
+    )
+
+def unpack(raw: bytes) -> Ticket:
+    return Ticket(*msgpack.unpackb(raw, raw=False))
+
+def unpack_id_text(raw: bytes) -> tuple[str, str]:
+    """Just (id, text) from a packed Ticket, without building the dataclass."""
+    tid, text = msgpack.unpackb(raw, raw=False)[:2]
+    return tid, text
@@ -32,4 +32,10 @@ async def main():
         await asyncio.gather(*tasks)
     print("\n✅ All tickets sent! Check Docker logs for worker processing.")
 
-asyncio.run(main())
\ No newline at end of file
+if __name__ == "__main__":
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())  # default asyncio loop (e.g. on Windows)
+    else:
+        uvloop.run(main())
\ No newline at end of file
@@ -28,4 +28,10 @@ async def main():
         await asyncio.gather(*tasks)
     print("✅ Storm tickets sent! Watch Docker logs for storm detection.")
 
-asyncio.run(main())
\ No newline at end of file
+if __name__ == "__main__":
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())  # default asyncio loop (e.g. on Windows)
+    else:
+        uvloop.run(main())
\ No newline at end of file
@@ -15,9 +15,9 @@ def urgency_score(text: str) -> float:
     """Stub: always returns 0.5"""
     return 0.5
 
-def get_embedding(text: str) -> list[float]:
-    """Stub: returns a zero vector of length 384"""
-    return [0.0] * 384
+def get_embedding(text: str) -> bytes:
+    """Stub: returns a zero int8 vector of length 384"""
+    return bytes(384)
 
 def is_storm(recent_tickets: list) -> bool:
     """Stub: always returns False"""
@@ -27,6 +27,14 @@ def get_model_latency_ms() -> float:
     """Stub: returns 100ms"""
     return 100.0
 
+def set_fallback(value: bool) -> None:
+    """Stub: no-op"""
+    pass
+
+def is_fallback() -> bool:
+    """Stub: always returns False"""
+    return False
+
 def create_master_incident(tickets: list) -> str:
     """Stub: returns a new UUID and marks tickets as duplicates"""
     incident_id = str(uuid.uuid4())
@@ -41,14 +49,22 @@ def enqueue(ticket: Ticket) -> None:
     """Stub: no-op"""
     pass
 
+def dequeue_batch(n: int) -> list[Ticket]:
+    """Stub: always returns an empty batch"""
+    return []
+
 def assign_agent(ticket: Ticket) -> str:
     """Stub: always returns 'agent-1'"""
     return 'agent-1'
 
+def assign_agents(tickets: list[Ticket]) -> list[str]:
+    """Stub: always returns 'agent-1' for every ticket"""
+    return ['agent-1'] * len(tickets)
+
 def get_queue_depth() -> int:
     """Stub: always returns 0"""
     return 0
 
-def check_storm_window(ticket: Ticket) -> bool:
+def check_storm_window(ticket: Optional[Ticket] = None, now_ns: Optional[int] = None) -> bool:
     """Stub: always returns False"""
     return False
@@ -2,9 +2,8 @@
 import os
 import time
 import redis
-import json
 import uuid
-from shared_types import Ticket
+from shared_types import Ticket, pack, unpack
 from router import assign_agent
 
 # --- CONFIG ---
@@ -18,8 +17,8 @@ r = redis.from_url(REDIS_URL)
 def push_ticket_to_queue(text: str):
     ticket_id = str(uuid.uuid4())
     ticket = Ticket(id=ticket_id, text=text)
-    # Push raw JSON to Redis
-    r.lpush(QUEUE_KEY, json.dumps(ticket.__dict__))
+    # Push MessagePack payload to Redis (same wire format as api_server)
+    r.lpush(QUEUE_KEY, pack(ticket))
     print(f"[API TEST] Ticket queued: {ticket_id}")
     return ticket
 
@@ -30,8 +29,7 @@ def simulate_worker_processing():
         if not item:
             break
         _, raw_ticket = item
-        data = json.loads(raw_ticket)
-        ticket = Ticket(**data)
+        ticket = unpack(raw_ticket)
 
         # --- ML simulation (replace with real imports if available) ---
         try:
@@ -4,7 +4,6 @@
 
 import os
 import sys
-import json
 import asyncio
 import pytest
 import pytest_asyncio
@@ -26,6 +25,7 @@ import api_server
 api_server._redis_client = None  # type: ignore
 
 from api_server import app
+from shared_types import Ticket, pack, unpack
 
 # ─────────────────────────────────────────────────────────────────────────────
 # PHASE 1 TESTS — Sync API behaviour
@@ -55,13 +55,21 @@ async def test_post_ticket_uses_provided_id():
 
 @pytest.mark.asyncio
 async def test_post_ticket_autogenerates_id():
-    """If no id is supplied, the API should generate one (UUID)."""
+    """If no id is supplied, the API should generate one (16-char time-sorted hex)."""
     async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
         resp = await ac.post("/ticket", json={"text": "Need legal advice"})
     assert resp.status_code == 200
     ticket_id = resp.json()["id"]
     assert ticket_id is not None
-    assert len(ticket_id) > 0
+    assert len(ticket_id) == 16
+    int(ticket_id, 16)
+
+
+def test_generated_ids_unique_sorted_and_node_scoped():
+    """IDs are strictly increasing within a process and carry the node id."""
+    ids = [api_server._next_id() for _ in range(10_000)]   # > 4096 per ms
+    assert ids == sorted(set(ids))
+    assert all((int(i, 16) >> 12) & 0x3FF == api_server._id_node for i in ids)
 
 
 @pytest.mark.asyncio
@@ -89,11 +97,28 @@ async def test_get_health_circuit_breaker_closed_by_default():
 # PHASE 2 TESTS — Async broker mode
 # ─────────────────────────────────────────────────────────────────────────────
 
+def _mock_redis():
+    """AsyncMock Redis client whose pipeline() records buffered commands."""
+    mock_pipe = mock.MagicMock()
+    mock_pipe.__aenter__.return_value = mock_pipe
+    mock_pipe.execute = mock.AsyncMock(return_value=[1, 1, True])
+    mock_redis_instance = mock.AsyncMock()
+    mock_redis_instance.pipeline = mock.MagicMock(return_value=mock_pipe)
+    return mock_redis_instance, mock_pipe
+
+def _mock_worker_redis(execute_result):
+    """Plain Redis mock for worker._process_batch; execute() returns the SETNX results."""
+    mock_pipe = mock.MagicMock()
+    mock_pipe.__aenter__.return_value = mock_pipe
+    mock_pipe.execute = mock.AsyncMock(return_value=execute_result)
+    redis = mock.MagicMock()
+    redis.pipeline = mock.MagicMock(return_value=mock_pipe)
+    return redis, mock_pipe
+
 @pytest.mark.asyncio
 async def test_post_ticket_returns_202_when_redis_available():
     """When Redis is available, POST /ticket should return 202 Accepted."""
-    mock_redis_instance = mock.AsyncMock()
-    mock_redis_instance.lpush = mock.AsyncMock(return_value=1)
+    mock_redis_instance, _ = _mock_redis()
     api_server._redis_client = mock_redis_instance
 
     async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
@@ -110,24 +135,116 @@ async def test_post_ticket_returns_202_when_redis_available():
 @pytest.mark.asyncio
 async def test_202_response_calls_redis_lpush():
     """When Redis is active, the ticket payload must be pushed to Redis."""
-    mock_redis_instance = mock.AsyncMock()
-    mock_redis_instance.lpush = mock.AsyncMock(return_value=1)
+    mock_redis_instance, mock_pipe = _mock_redis()
     api_server._redis_client = mock_redis_instance
 
     async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
         await ac.post("/ticket", json={"id": "t-redis-01", "text": "Test ticket"})
 
-    mock_redis_instance.lpush.assert_called_once()
-    call_args = mock_redis_instance.lpush.call_args
-    queue_key = call_args[0][0]
-    raw_payload = call_args[0][1]
+    mock_redis_instance.pipeline.assert_called_once_with(transaction=False)
+    mock_pipe.execute.assert_awaited_once()
+    queue_call, recent_call = mock_pipe.lpush.call_args_list
+    queue_key = queue_call[0][0]
+    raw_payload = queue_call[0][1]
     assert queue_key == "tickets_queue"
-    payload = json.loads(raw_payload)
-    assert payload["id"] == "t-redis-01"
+    assert unpack(raw_payload).id == "t-redis-01"
+    assert recent_call[0] == ("recent_tickets", raw_payload)
+    mock_pipe.ltrim.assert_called_once_with("recent_tickets", 0, 29)
 
     api_server._redis_client = None
 
 
+@pytest.mark.asyncio
+async def test_concurrent_202_requests_share_one_lpush():
+    """Concurrent POSTs are coalesced into a single variadic LPUSH."""
+    mock_redis_instance, mock_pipe = _mock_redis()
+    api_server._redis_client = mock_redis_instance
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        responses = await asyncio.gather(*[
+            ac.post("/ticket", json={"id": f"t-batch-{i}", "text": "Burst"})
+            for i in range(10)
+        ])
+
+    assert all(r.status_code == 202 for r in responses)
+    mock_pipe.execute.assert_awaited_once()
+    queue_call = mock_pipe.lpush.call_args_list[0]
+    assert queue_call[0][0] == "tickets_queue"
+    assert len(queue_call[0]) == 11
+
+    api_server._redis_client = None
+
+
+@pytest.mark.asyncio
+async def test_recent_tickets_reads_feed():
+    """GET /tickets/recent returns the decoded recent-ticket feed."""
+    mock_redis_instance, _ = _mock_redis()
+    mock_redis_instance.lrange = mock.AsyncMock(
+        return_value=[pack(Ticket(id="t-2", text="b")), pack(Ticket(id="t-1", text="a"))]
+    )
+    api_server._redis_client = mock_redis_instance
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        resp = await ac.get("/tickets/recent")
+    assert resp.status_code == 200
+    assert [t["id"] for t in resp.json()] == ["t-2", "t-1"]
+
+    api_server._redis_client = None
+
+
+
+@pytest.mark.asyncio
+async def test_push_batcher_submits_during_slow_flush_complete():
+    """Submits that land while a flush awaits Redis are still flushed."""
+    mock_redis_instance, mock_pipe = _mock_redis()
+
+    async def slow_execute():
+        await asyncio.sleep(0.05)
+        return [1, 1, True]
+
+    mock_pipe.execute = mock.AsyncMock(side_effect=slow_execute)
+    api_server._redis_client = mock_redis_instance
+    batcher = api_server._PushBatcher(max_size=2, window_ms=1)
+
+    # (a) window flush in flight, one more submit arrives
+    first = asyncio.create_task(batcher.submit(b"a"))
+    await asyncio.sleep(0.01)
+    await asyncio.wait_for(asyncio.gather(first, batcher.submit(b"b")), timeout=1)
+
+    # (b) size limit reached while a window flush is in flight
+    first = asyncio.create_task(batcher.submit(b"c"))
+    await asyncio.sleep(0.01)
+    await asyncio.wait_for(
+        asyncio.gather(first, batcher.submit(b"d"), batcher.submit(b"e")), timeout=1
+    )
+
+    assert mock_pipe.execute.await_count == 4
+    api_server._redis_client = None
+
+
+@pytest.mark.asyncio
+async def test_push_batcher_survives_cancelled_flushing_request():
+    """Cancelling the request that hit the size limit does not strand the others."""
+    mock_redis_instance, mock_pipe = _mock_redis()
+
+    async def slow_execute():
+        await asyncio.sleep(0.05)
+        return [1, 1, True]
+
+    mock_pipe.execute = mock.AsyncMock(side_effect=slow_execute)
+    api_server._redis_client = mock_redis_instance
+    batcher = api_server._PushBatcher(max_size=3, window_ms=1000)
+
+    others = [asyncio.create_task(batcher.submit(p)) for p in (b"a", b"b")]
+    await asyncio.sleep(0)
+    trigger = asyncio.create_task(batcher.submit(b"c"))
+    await asyncio.sleep(0.01)              # flush is inside execute()
+    trigger.cancel()
+
+    await asyncio.wait_for(asyncio.gather(*others), timeout=1)
+    mock_pipe.execute.assert_awaited_once()
+    api_server._redis_client = None
+
 # ─────────────────────────────────────────────────────────────────────────────
 # PHASE 2 TESTS — Stress test (concurrency)
 # ─────────────────────────────────────────────────────────────────────────────
@@ -159,13 +276,12 @@ async def test_15_concurrent_requests_all_accepted():
 # ─────────────────────────────────────────────────────────────────────────────
 
 @pytest.mark.asyncio
-async def test_health_reports_open_circuit_when_env_set():
-    """When MODEL_FALLBACK=1 is set, /health must report circuit_breaker=open."""
-    os.environ["MODEL_FALLBACK"] = "1"
-    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
-        resp = await ac.get("/health")
+async def test_health_reports_open_circuit_when_fallback_active():
+    """When the model fallback is active, /health must report circuit_breaker=open."""
+    with mock.patch.object(api_server, "is_fallback", lambda: True):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            resp = await ac.get("/health")
     assert resp.json()["circuit_breaker"] == "open"
-    os.environ.pop("MODEL_FALLBACK")
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -176,6 +292,7 @@ def test_circuit_breaker_opens_after_3_slow_calls():
     """Three consecutive slow calls should open the circuit."""
     import worker
     os.environ.pop("MODEL_FALLBACK", None)
+    worker._sync_breaker_from_env()
     worker._consecutive_slow_calls = 0
     worker._consecutive_fast_calls = 0
 
@@ -185,6 +302,7 @@ def test_circuit_breaker_opens_after_3_slow_calls():
 
     assert os.getenv("MODEL_FALLBACK") == "1"
     os.environ.pop("MODEL_FALLBACK")
+    worker.set_fallback(False)
     worker._consecutive_slow_calls = 0
 
 
@@ -192,6 +310,7 @@ def test_circuit_breaker_closes_after_5_fast_calls():
     """Five consecutive fast calls should close an open circuit."""
     import worker
     os.environ["MODEL_FALLBACK"] = "1"
+    worker._sync_breaker_from_env()
     worker._consecutive_slow_calls = 0
     worker._consecutive_fast_calls = 0
 
@@ -205,6 +324,7 @@ def test_circuit_breaker_resets_on_mid_band_latency():
     """A mid-band latency (200–500ms) should reset counters without changing state."""
     import worker
     os.environ.pop("MODEL_FALLBACK", None)
+    worker._sync_breaker_from_env()
     worker._consecutive_slow_calls = 2  # almost open
     worker._consecutive_fast_calls = 0
 
@@ -212,3 +332,205 @@ def test_circuit_breaker_resets_on_mid_band_latency():
 
     assert worker._consecutive_slow_calls == 0
     assert os.getenv("MODEL_FALLBACK") is None
+
+
+@pytest.mark.asyncio
+async def test_worker_batch_locks_pipelined_and_duplicates_skipped():
+    """A popped batch takes all SETNX locks in one pipeline; losers are skipped."""
+    import worker
+    redis, mock_pipe = _mock_worker_redis([True, None])
+    raws = [pack(Ticket(id="w-1", text="a")), pack(Ticket(id="w-1", text="a"))]
+
+    with mock.patch.object(worker, "_route_tickets", mock.AsyncMock()) as route, \
+         mock.patch.object(worker, "check_storm_window", lambda t=None, now_ns=None: False):
+        await worker._process_batch(raws, redis)
+
+    assert mock_pipe.set.call_count == 2
+    mock_pipe.execute.assert_awaited_once()
+    route.assert_awaited_once_with([("w-1", "a")])
+
+
+@pytest.mark.asyncio
+async def test_storm_burst_flushes_one_master_incident():
+    """A burst of storm tickets coalesces into a single incident and webhook."""
+    import worker
+    incident = mock.MagicMock(return_value="inc-1")
+
+    with mock.patch.object(worker, "create_master_incident", incident), \
+         mock.patch.object(worker, "_fire_webhook", mock.AsyncMock()) as webhook, \
+         mock.patch.object(worker, "STORM_FLUSH_WINDOW_SECONDS", 0.01):
+        for i in range(11):
+            worker._handle_storm(Ticket(id=f"s-{i}", text="outage"))
+        await worker._storm_flush_task
+
+    incident.assert_called_once()
+    assert len(incident.call_args.args[0]) == 11
+    webhook.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_storm_ticket_during_webhook_gets_its_own_flush():
+    """A storm ticket arriving while the previous flush is posting is not stranded."""
+    import worker
+    incident = mock.MagicMock(return_value="inc-2")
+
+    async def slow_webhook(payload):
+        await asyncio.sleep(0.05)
+
+    with mock.patch.object(worker, "create_master_incident", incident), \
+         mock.patch.object(worker, "_fire_webhook", slow_webhook), \
+         mock.patch.object(worker, "STORM_FLUSH_WINDOW_SECONDS", 0.01):
+        worker._handle_storm(Ticket(id="s-a", text="outage"))
+        first = worker._storm_flush_task
+        await asyncio.sleep(0.02)          # first flush is now inside the webhook
+        worker._handle_storm(Ticket(id="s-b", text="outage"))
+        second = worker._storm_flush_task
+        await asyncio.gather(first, second)
+
+    assert incident.call_count == 2
+    assert worker._storm_batch == []
+
+
+@pytest.mark.asyncio
+async def test_urgent_webhooks_coalesced_into_one_post():
+    """Alerts queued within the flush window are sent as a single message."""
+    import worker
+
+    with mock.patch.object(worker, "_fire_webhook", mock.AsyncMock()) as webhook, \
+         mock.patch.object(worker, "WEBHOOK_FLUSH_WINDOW_SECONDS", 0.01):
+        for i in range(5):
+            worker._queue_webhook(f"alert {i}")
+        await worker._webhook_flush_task
+
+    webhook.assert_awaited_once()
+    assert webhook.await_args.args[0]["text"].count("alert") == 5
+
+
+@pytest.mark.asyncio
+async def test_webhook_queued_during_post_is_flushed():
+    """An alert queued while the previous batch is being posted still goes out."""
+    import worker
+    sent = []
+
+    async def slow_webhook(payload):
+        await asyncio.sleep(0.05)
+        sent.append(payload["text"])
+
+    with mock.patch.object(worker, "_fire_webhook", slow_webhook), \
+         mock.patch.object(worker, "WEBHOOK_FLUSH_WINDOW_SECONDS", 0.01):
+        worker._queue_webhook("one")
+        first = worker._webhook_flush_task
+        await asyncio.sleep(0.02)          # first flush is now inside the POST
+        worker._queue_webhook("two")
+        second = worker._webhook_flush_task
+        await asyncio.gather(first, second)
+
+    assert sent == ["one", "two"]
+    assert worker._webhook_pending == []
+
+
+@pytest.mark.asyncio
+async def test_worker_skips_recently_locked_id_without_redis():
+    """An id this worker locked moments ago is dropped before any SETNX."""
+    import worker
+    redis, _ = _mock_worker_redis([True])
+    raw = pack(Ticket(id="w-lru", text="a"))
+
+    with mock.patch.object(worker, "_route_tickets", mock.AsyncMock()) as route, \
+         mock.patch.object(worker, "check_storm_window", lambda t=None, now_ns=None: False):
+        await worker._process_batch([raw], redis)
+        await worker._process_batch([raw], redis)
+
+    assert redis.pipeline.call_count == 1
+    route.assert_awaited_once_with([("w-lru", "a")])
+
+
+@pytest.mark.asyncio
+async def test_worker_skips_only_malformed_payload():
+    """One undecodable entry is dropped; the rest of the batch is still routed."""
+    import worker
+    redis, _ = _mock_worker_redis([True, True])
+    raws = [
+        pack(Ticket(id="w-good-1", text="a")),
+        b'{"id": "w-json", "text": "legacy"}',
+        pack(Ticket(id="w-good-2", text="b")),
+    ]
+
+    with mock.patch.object(worker, "_route_tickets", mock.AsyncMock()) as route, \
+         mock.patch.object(worker, "check_storm_window", lambda t=None, now_ns=None: False):
+        await worker._process_batch(raws, redis)
+
+    route.assert_awaited_once_with([("w-good-1", "a"), ("w-good-2", "b")])
+
+
+@pytest.mark.asyncio
+async def test_worker_shutdown_requeues_or_finishes_popped_batches():
+    """On shutdown no popped ticket is lost: unstarted ones go back to Redis."""
+    import worker
+    popped = [[pack(Ticket(id=f"w-sd-{b}-{i}", text="x")) for i in range(2)] for b in range(4)]
+    feed = iter(popped)
+
+    async def blmpop(*args, **kwargs):
+        await asyncio.sleep(0)
+        batch = next(feed, None)
+        if batch is None:
+            raise asyncio.CancelledError  # worker is being stopped
+        return [b"tickets_queue", batch]
+
+    processed = []
+
+    async def slow_process(raws, redis):
+        await asyncio.sleep(0.05)
+        processed.extend(raws)
+
+    redis = mock.MagicMock()
+    redis.blmpop = blmpop
+    redis.lpush = mock.AsyncMock()
+
+    with mock.patch.object(worker.aioredis.Redis, "from_pool", lambda pool: redis), \
+         mock.patch.object(worker, "WORKER_CONCURRENCY", 1), \
+         mock.patch.object(worker, "_process_batch", slow_process):
+        with pytest.raises(asyncio.CancelledError):
+            await worker.run_worker()
+
+    requeued = list(redis.lpush.await_args.args[1:]) if redis.lpush.await_args else []
+    assert processed
+    assert sorted(processed + requeued) == sorted(raw for batch in popped for raw in batch)
+
+
+@pytest.mark.asyncio
+async def test_worker_shutdown_requeues_batch_blocked_on_full_pool():
+    """A batch popped while the pool queue is full is re-queued, not lost."""
+    import worker
+    popped = []
+
+    async def blmpop(*args, **kwargs):
+        await asyncio.sleep(0)
+        batch = [pack(Ticket(id=f"w-full-{len(popped)}-{i}", text="x")) for i in range(2)]
+        popped.extend(batch)
+        return [b"tickets_queue", batch]
+
+    processed = []
+
+    async def slow_process(raws, redis):
+        await asyncio.sleep(0.05)
+        processed.extend(raws)
+
+    redis = mock.MagicMock()
+    redis.blmpop = blmpop
+    redis.lpush = mock.AsyncMock()
+
+    with mock.patch.object(worker.aioredis.Redis, "from_pool", lambda pool: redis), \
+         mock.patch.object(worker, "WORKER_CONCURRENCY", 1), \
+         mock.patch.object(worker, "_process_batch", slow_process):
+        task = asyncio.create_task(worker.run_worker())
+        # 1 batch processing + 2 queued + 1 parked in put() = 8 tickets popped
+        while len(popped) < 8:
+            await asyncio.sleep(0.001)
+        await asyncio.sleep(0.005)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    requeued = list(redis.lpush.await_args.args[1:])
+    assert sorted(processed + requeued) == sorted(popped)
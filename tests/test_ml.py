@@ -1,13 +1,17 @@
 # tests/test_ml.py
 
-import os
+import asyncio
 from ml_engine import (
     classify,
+    classify_batch,
+    classify_async,
     urgency_score,
+    urgency_score_batch,
     get_model_latency_ms,
     get_embedding,
     is_storm,
     create_master_incident,
+    set_fallback,
 )
 from shared_types import Ticket
 
@@ -61,6 +65,29 @@ def test_urgency_type():
     assert isinstance(score, float)
 
 
+# --------------------------
+# Batch Tests
+# --------------------------
+
+def test_classify_batch_matches_single():
+    texts = ["Refund my invoice", "", "Server crashed", "I need the GDPR policy"]
+    assert classify_batch(texts) == [classify(t) for t in texts]
+
+
+def test_urgency_score_batch_range():
+    scores = urgency_score_batch(["urgent outage", "", "general question"])
+    assert len(scores) == 3
+    assert scores[1] == 0.0
+    assert all(0 <= s <= 1 for s in scores)
+
+
+def test_classify_async_concurrent():
+    async def run():
+        return await asyncio.gather(*(classify_async("Refund my invoice") for _ in range(5)))
+
+    assert asyncio.run(run()) == ["Billing"] * 5
+
+
 # --------------------------
 # Latency Tests
 # --------------------------
@@ -105,6 +132,27 @@ def test_storm_detection_false():
     assert is_storm(tickets) is False
 
 
+def test_storm_detection_counts_pairs_in_a_large_window():
+    """In a 100-ticket window, a 5-ticket cluster (10 similar pairs) is a storm; 4 is not."""
+    import numpy as np
+    rng = np.random.default_rng(7)
+
+    def quantised(v):
+        v = v / np.linalg.norm(v)
+        return (v * 127).round().astype(np.int8).tobytes()
+
+    base = rng.standard_normal(384)
+    noise = [quantised(rng.standard_normal(384)) for _ in range(95)]
+
+    def window(cluster_size):
+        cluster = [quantised(base + 0.1 * rng.standard_normal(384)) for _ in range(cluster_size)]
+        embeddings = noise[: 100 - cluster_size] + cluster
+        return [Ticket(id=str(i), text="t", embedding=e) for i, e in enumerate(embeddings)]
+
+    assert is_storm(window(5)) is True
+    assert is_storm(window(4)) is False
+
+
 def test_master_incident_creation():
     tickets = [Ticket(id=str(i), text="Test") for i in range(3)]
 
@@ -120,7 +168,7 @@ def test_master_incident_creation():
 # --------------------------
 
 def test_model_fallback():
-    os.environ["MODEL_FALLBACK"] = "1"
+    set_fallback(True)
 
     result = classify("Please refund my payment")
     score = urgency_score("urgent issue")
@@ -128,4 +176,4 @@ def test_model_fallback():
     assert isinstance(result, str)
     assert 0 <= score <= 1
 
-    del os.environ["MODEL_FALLBACK"]
+    set_fallback(False)
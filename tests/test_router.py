@@ -1,7 +1,9 @@
 # tests/test_router.py
 
 from shared_types import Ticket
-from router import enqueue, dequeue, get_queue_depth, assign_agent
+import random
+from router import enqueue, dequeue, dequeue_batch, get_queue_depth, assign_agent, PriorityQueue
+from agent_registry import AgentRegistry
 
 def test_priority_queue():
     t1 = Ticket(id="1", text="Low", urgency_score=0.2)
@@ -13,7 +15,52 @@ def test_priority_queue():
     first = dequeue()
     assert first.id == "2"
 
+def test_priority_queue_pops_in_urgency_then_fifo_order():
+    rng = random.Random(0)
+    pq = PriorityQueue()
+    tickets = [Ticket(id=str(i), text="", urgency_score=rng.choice([0.1, 0.5, 0.9, rng.random()]))
+               for i in range(500)]
+    for t in tickets:
+        pq.push(t)
+
+    popped = [pq.pop() for _ in range(len(tickets))]
+
+    # Urgency is bucketed to 0.01 steps; arrival order breaks ties in a bucket
+    expected = sorted(tickets, key=lambda t: (-int(t.urgency_score * 100), int(t.id)))
+    assert [t.id for t in popped] == [t.id for t in expected]
+    assert pq.pop() is None
+
+def test_dequeue_batch():
+    while dequeue() is not None:
+        pass
+    for i, u in enumerate([0.3, 0.8, 0.5]):
+        enqueue(Ticket(id=f"b{i}", text="", urgency_score=u))
+
+    assert [t.id for t in dequeue_batch(2)] == ["b1", "b2"]
+    assert [t.id for t in dequeue_batch(5)] == ["b0"]
+    assert dequeue_batch(5) == []
+
 def test_agent_assignment():
     t = Ticket(id="3", text="Billing issue", category="Billing", urgency_score=0.5)
     agent = assign_agent(t)
-    assert agent in ["agent-1", "agent-2", "agent-3"]
\ No newline at end of file
+    assert agent in ["agent-1", "agent-2", "agent-3"]
+
+def test_assign_many_respects_capacity():
+    registry = AgentRegistry()
+    tickets = [Ticket(id=str(i), text="Legal", category="Legal") for i in range(14)]
+
+    agents = registry.assign_many(tickets)
+
+    assert agents.count("agent-3") == 3
+    assert agents.count("queued") == 1
+    assert agents[0] == "agent-3"
+
+def test_assign_many_queues_least_urgent_when_full():
+    registry = AgentRegistry()
+    registry.load[:] = registry.capacity
+    registry.load[2] -= 1                      # one free slot, on the Legal expert
+
+    calm = Ticket(id="calm", text="Legal", category="Legal", urgency_score=0.1)
+    urgent = Ticket(id="urgent", text="Billing", category="Billing", urgency_score=0.95)
+
+    assert registry.assign_many([calm, urgent]) == ["queued", "agent-3"]
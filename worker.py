@@ -1,22 +1,44 @@
 # worker.py  ──  Member B owns this file
 # Background worker: pulls tickets from Redis, processes them, fires webhooks.
 # Implements:
-#   Phase 2 — async BLPOP loop + SETNX atomic locking + webhook trigger
+#   Phase 2 — async BLMPOP batch loop + SETNX atomic locking + webhook trigger
 #   Phase 3 — circuit breaker + storm short-circuit
 
 import os
-import json
+import queue
+import signal
 import asyncio
+import logging
+import logging.handlers
 import httpx
+from collections import OrderedDict
 
 import redis.asyncio as aioredis
 
-from shared_types import Ticket
+# orjson (C, writes bytes) for outgoing JSON bodies; stdlib json as fallback.
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+except ImportError:
+    import json
+    _json_dumps = lambda obj: json.dumps(obj).encode()
+
+from shared_types import Ticket, unpack_id_text
 from config import (
     REDIS_URL,
+    REDIS_MAX_CONNECTIONS,
+    REDIS_HEALTH_CHECK_INTERVAL,
+    REDIS_POOL_TIMEOUT_SECONDS,
     REDIS_QUEUE_KEY,
     REDIS_LOCK_TTL_SECONDS,
+    LOCK_CACHE_MAX,
+    STORM_FLUSH_WINDOW_SECONDS,
+    WORKER_BATCH_SIZE,
+    WORKER_CONCURRENCY,
+    WORKER_SHUTDOWN_TIMEOUT_SECONDS,
+    LOG_LEVEL,
     URGENCY_WEBHOOK_THRESHOLD,
+    WEBHOOK_FLUSH_WINDOW_SECONDS,
     WEBHOOK_URL,
     CIRCUIT_BREAKER_LATENCY_MS,
     CIRCUIT_BREAKER_OPEN_COUNT,
@@ -29,62 +51,108 @@ from config import (
 
 try:
     from ml_engine import (
-        classify,
-        urgency_score,
+        classify_async,
+        urgency_score_async,
         get_model_latency_ms,
         is_storm,
         get_embedding,
         create_master_incident,
+        set_fallback,
     )
 except ImportError:
-    classify = lambda t: "Technical"
-    urgency_score = lambda t: 0.5
+    async def classify_async(t): return "Technical"
+    async def urgency_score_async(t): return 0.5
     get_model_latency_ms = lambda: 100.0
     is_storm = lambda tickets: False
-    get_embedding = lambda t: [0.0] * 384
+    get_embedding = lambda t: bytes(384)
     create_master_incident = lambda tickets: "stub-incident-id"
+    set_fallback = lambda value: None
 
 try:
-    from router import enqueue, assign_agent, check_storm_window, get_queue_depth
+    from router import enqueue, assign_agents, check_storm_window, get_queue_depth
 except ImportError:
     enqueue = lambda t: None
-    assign_agent = lambda t: "agent-1"
-    check_storm_window = lambda t: False
+    assign_agents = lambda tickets: ["agent-1"] * len(tickets)
+    check_storm_window = lambda t=None, now_ns=None: False
     get_queue_depth = lambda: 0
 
+# ── Logging ───────────────────────────────────────────────────────────────────
+# Handlers run on a QueueListener thread; the event loop only enqueues records
+# and never blocks on stdout.
+log = logging.getLogger("worker")
+
+_log_listener: logging.handlers.QueueListener | None = None
+
+def _start_logging() -> None:
+    global _log_listener
+    if _log_listener is not None:
+        return
+
+    records: queue.Queue = queue.Queue(-1)
+    stream = logging.StreamHandler()
+    stream.setFormatter(logging.Formatter("%(message)s"))
+    _log_listener = logging.handlers.QueueListener(records, stream)
+
+    log.addHandler(logging.handlers.QueueHandler(records))
+    log.setLevel(LOG_LEVEL)
+    log.propagate = False
+    _log_listener.start()
+
+def _stop_logging() -> None:
+    """Flush queued records and detach the handler."""
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+        _log_listener = None
+    log.handlers.clear()
+    log.propagate = True
+
 # ── Circuit Breaker State ─────────────────────────────────────────────────────
 
 _consecutive_slow_calls: int = 0
 _consecutive_fast_calls: int = 0
 
+# In-process breaker state; the env var is only written on transitions.
+_breaker_open: bool = bool(os.getenv(MODEL_FALLBACK_ENV_VAR))
+
+def _sync_breaker_from_env() -> None:
+    """Re-read the breaker state from MODEL_FALLBACK (e.g. after an external change)."""
+    global _breaker_open
+    _breaker_open = bool(os.getenv(MODEL_FALLBACK_ENV_VAR))
+
 def _update_circuit_breaker(latency_ms: float) -> None:
     """
-    Track consecutive slow/fast ML calls and flip MODEL_FALLBACK env var.
+    Track consecutive slow/fast ML calls and flip the ml_engine fallback flag
+    (mirrored in the MODEL_FALLBACK env var).
     Open  → 3+ consecutive calls > 500ms
     Close → 5+ consecutive calls < 200ms
     """
-    global _consecutive_slow_calls, _consecutive_fast_calls
+    global _consecutive_slow_calls, _consecutive_fast_calls, _breaker_open
 
     if latency_ms > CIRCUIT_BREAKER_LATENCY_MS:
         _consecutive_slow_calls += 1
         _consecutive_fast_calls = 0
         if _consecutive_slow_calls >= CIRCUIT_BREAKER_OPEN_COUNT:
-            if not os.getenv(MODEL_FALLBACK_ENV_VAR):
+            if not _breaker_open:
+                _breaker_open = True
                 os.environ[MODEL_FALLBACK_ENV_VAR] = "1"
-                print(
-                    f"⚡ CIRCUIT OPEN — {_consecutive_slow_calls} consecutive calls "
-                    f"exceeded {CIRCUIT_BREAKER_LATENCY_MS}ms"
+                set_fallback(True)
+                log.warning(
+                    "⚡ CIRCUIT OPEN — %d consecutive calls exceeded %sms",
+                    _consecutive_slow_calls, CIRCUIT_BREAKER_LATENCY_MS,
                 )
     elif latency_ms < CIRCUIT_BREAKER_FAST_MS:
         _consecutive_fast_calls += 1
         _consecutive_slow_calls = 0
         if _consecutive_fast_calls >= CIRCUIT_BREAKER_CLOSE_COUNT:
-            if os.getenv(MODEL_FALLBACK_ENV_VAR):
-                del os.environ[MODEL_FALLBACK_ENV_VAR]
+            if _breaker_open:
+                _breaker_open = False
+                os.environ.pop(MODEL_FALLBACK_ENV_VAR, None)
+                set_fallback(False)
                 _consecutive_fast_calls = 0
-                print(
-                    f"✅ CIRCUIT CLOSED — {_consecutive_fast_calls} consecutive fast calls "
-                    f"below {CIRCUIT_BREAKER_FAST_MS}ms"
+                log.warning(
+                    "✅ CIRCUIT CLOSED — %d consecutive fast calls below %sms",
+                    _consecutive_fast_calls, CIRCUIT_BREAKER_FAST_MS,
                 )
     else:
         # Latency in the middle band — reset counters without changing state
@@ -92,46 +160,125 @@ def _update_circuit_breaker(latency_ms: float) -> None:
         _consecutive_fast_calls = 0
 
 # ── Webhook Helper ────────────────────────────────────────────────────────────
+# One AsyncClient per worker process so webhooks reuse pooled connections
+# instead of paying a TCP + TLS handshake each time.
+_http_client: httpx.AsyncClient | None = None
+
+def _get_http_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            http2=True,
+            timeout=5.0,
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=32),
+        )
+    return _http_client
+
+async def _close_http_client() -> None:
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
 DISCORD_WEBHOOK = "https://discord.com/api/webhooks/1475144580692447244/EWlitNhR06fGJFRIXuafmbUgQmcO4vRXIhJEinZK-jMTVmbTgBv9nUEq15I9kXPvM3Hl"
 
+# Webhooks are side-channel notifications: they run as background tasks so a
+# slow Discord/Slack response never holds up ticket processing. References
+# are kept here so the tasks are not garbage-collected mid-flight.
+_background_tasks: set[asyncio.Task] = set()
+
+def _spawn(coro) -> asyncio.Task:
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+# The Discord body is {"username": ..., "content": <text>}: only the text
+# varies, so the rest is serialised once and spliced around it.
+_DISCORD_PREFIX = b'{"username":"SmartSupport Bot","content":'
+_DISCORD_SUFFIX = b"}"
+_JSON_HEADERS = {"content-type": "application/json"}
+
 async def _fire_webhook(payload: dict) -> None:
     try:
-        discord_payload = {
-            "content": payload.get("text", ""),
-            "username": "SmartSupport Bot",
-        }
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            resp = await client.post(DISCORD_WEBHOOK, json=discord_payload)
-            print(f"📣  Webhook fired → HTTP {resp.status_code}")
+        body = _DISCORD_PREFIX + _json_dumps(payload.get("text", "")) + _DISCORD_SUFFIX
+        resp = await _get_http_client().post(DISCORD_WEBHOOK, content=body, headers=_JSON_HEADERS)
+        log.info("📣  Webhook fired → HTTP %d", resp.status_code)
     except Exception as e:
-        print(f"⚠️  Webhook delivery failed: {e}")
+        log.warning("⚠️  Webhook delivery failed: %s", e)
+
+# Urgent alerts are coalesced: messages queued within
+# WEBHOOK_FLUSH_WINDOW_SECONDS go out as one Discord message (split only when
+# they would exceed Discord's content limit).
+DISCORD_CONTENT_MAX = 2000
+_WEBHOOK_SEPARATOR = "\n---\n"
+
+_webhook_pending: list[str] = []
+_webhook_flush_task: asyncio.Task | None = None
+
+def _queue_webhook(text: str) -> None:
+    global _webhook_flush_task
+    _webhook_pending.append(text)
+
+    if _webhook_flush_task is None:
+        _webhook_flush_task = _spawn(_flush_webhooks_after(WEBHOOK_FLUSH_WINDOW_SECONDS))
+
+async def _flush_webhooks_after(delay: float) -> None:
+    global _webhook_pending, _webhook_flush_task
+    await asyncio.sleep(delay)
+
+    # Cleared with the swap: alerts queued while the POSTs below are in
+    # flight schedule the next flush.
+    batch, _webhook_pending = _webhook_pending, []
+    _webhook_flush_task = None
+    content = ""
+    for text in batch:
+        if content and len(content) + len(_WEBHOOK_SEPARATOR) + len(text) > DISCORD_CONTENT_MAX:
+            await _fire_webhook({"text": content})
+            content = text
+        else:
+            content = f"{content}{_WEBHOOK_SEPARATOR}{text}" if content else text
+    if content:
+        await _fire_webhook({"text": content})
 
 # ── Storm batch storage (Phase 3) ─────────────────────────────────────────────
 
 _storm_batch: list[Ticket] = []
+_storm_flush_task: asyncio.Task | None = None
 
-async def _handle_storm(ticket: Ticket) -> None:
+def _handle_storm(ticket: Ticket) -> None:
     """
-    When check_storm_window signals a storm, collect the batch,
-    create a single master incident, and fire ONE consolidated webhook.
+    When check_storm_window signals a storm, add the ticket to the pending
+    batch. The first ticket of a burst schedules a single flush; later ones
+    just join the batch, so a storm costs one sleep, one master incident and
+    ONE consolidated webhook.
     """
-    global _storm_batch
+    global _storm_flush_task
     _storm_batch.append(ticket)
 
-    # We wait a short window to let more storm tickets accumulate
-    await asyncio.sleep(0.1)
+    if _storm_flush_task is None:
+        _storm_flush_task = _spawn(_flush_storm_after(STORM_FLUSH_WINDOW_SECONDS))
 
-    if not _storm_batch:
-        return  # Already handled by another coroutine
+async def _flush_storm_after(delay: float) -> None:
+    """Wait out the coalescing window, then flush everything collected so far."""
+    global _storm_batch, _storm_flush_task
 
+    # Let more storm tickets accumulate
+    await asyncio.sleep(delay)
+
+    # No await between the check and the swap, so the event loop cannot
+    # interleave another _handle_storm here. Clearing the task with the swap
+    # lets tickets arriving during the webhook below schedule their own flush.
     batch, _storm_batch = _storm_batch, []
+    _storm_flush_task = None
     if not batch:
         return
 
     incident_id = create_master_incident(batch)
-    print(
-        f"🌊 STORM DETECTED — Master Incident {incident_id} "
-        f"created for {len(batch)} tickets. Individual routing suppressed."
+    log.warning(
+        "🌊 STORM DETECTED — Master Incident %s created for %d tickets. "
+        "Individual routing suppressed.",
+        incident_id, len(batch),
     )
     await _fire_webhook(
         {
@@ -146,98 +293,246 @@ async def _handle_storm(ticket: Ticket) -> None:
 
 # ── Core Ticket Processor ─────────────────────────────────────────────────────
 
-async def _process_ticket(raw: str, redis: aioredis.Redis) -> None:
-    """
-    Full processing pipeline for a single ticket:
-    1. Parse JSON
-    2. Acquire atomic lock (SETNX) to prevent duplicate processing
-    3. Phase 3: Storm short-circuit check
-    4. Classify + urgency score (with circuit breaker tracking)
-    5. Enqueue + assign agent
-    6. Fire webhook if urgency > threshold
-    7. Release lock
-    """
-    data = json.loads(raw)
-    ticket = Ticket(id=data["id"], text=data["text"])
-
-    # ── Atomic lock (SETNX) ───────────────────────────────────────────────────
-    lock_key = f"ticket:{ticket.id}:lock"
-    acquired = await redis.set(lock_key, "1", nx=True, ex=REDIS_LOCK_TTL_SECONDS)
-    if not acquired:
-        print(f"🔒 Duplicate skipped: {ticket.id}")
+async def _route_tickets(entries: list[tuple[str, str]]) -> None:
+    """Classify, score, enqueue and jointly assign a batch of (id, text) entries."""
+    if not entries:
         return
 
-    try:
-        print(f"🎫 Processing ticket {ticket.id}")
-
-        # ── Phase 3: Storm short-circuit ──────────────────────────────────────
-        if check_storm_window(ticket):
-            await _handle_storm(ticket)
-            return  # Skip individual routing for storm tickets
+    # ── ML Classification + Urgency (micro-batched across tickets) ────────────
+    categories = await asyncio.gather(*(classify_async(text) for _, text in entries))
+    scores = await asyncio.gather(*(urgency_score_async(text) for _, text in entries))
 
-        # ── ML Classification + Urgency ───────────────────────────────────────
-        ticket.category = classify(ticket.text)
-        ticket.urgency_score = urgency_score(ticket.text)
+    # Tickets are built once, with every field known
+    tickets = [
+        Ticket(id=tid, text=text, category=category, urgency_score=score)
+        for (tid, text), category, score in zip(entries, categories, scores)
+    ]
 
-        # ── Phase 3: Circuit breaker tracking ─────────────────────────────────
-        latency = get_model_latency_ms()
-        _update_circuit_breaker(latency)
+    # ── Phase 3: Circuit breaker tracking ─────────────────────────────────────
+    latency = get_model_latency_ms()
+    _update_circuit_breaker(latency)
 
-        # ── Route to agent ────────────────────────────────────────────────────
+    # ── Route to agents ───────────────────────────────────────────────────────
+    for ticket in tickets:
         enqueue(ticket)
-        agent_id = assign_agent(ticket)
+    agent_ids = assign_agents(tickets)
 
-        print(
-            f"✅ Ticket {ticket.id} → category={ticket.category}, "
-            f"urgency={ticket.urgency_score:.2f}, agent={agent_id}, "
-            f"latency={latency:.1f}ms"
+    for ticket, agent_id in zip(tickets, agent_ids):
+        log.info(
+            "✅ Ticket %s → category=%s, urgency=%.2f, agent=%s, latency=%.1fms",
+            ticket.id, ticket.category, ticket.urgency_score, agent_id, latency,
         )
 
-        # ── Webhook for high urgency ───────────────────────────────────────────
+        # ── Webhook for high urgency ──────────────────────────────────────────
         if ticket.urgency_score > URGENCY_WEBHOOK_THRESHOLD:
-            await _fire_webhook(
-                {
-                    "text": (
-                        f"🚨 *High-Urgency Ticket* `{ticket.id}`\n"
-                        f"*Category:* {ticket.category}\n"
-                        f"*Urgency:* {ticket.urgency_score:.2f}\n"
-                        f"*Assigned to:* {agent_id}\n"
-                        f"*Text:* {ticket.text[:200]}"
-                    )
-                }
+            _queue_webhook(
+                f"🚨 *High-Urgency Ticket* `{ticket.id}`\n"
+                f"*Category:* {ticket.category}\n"
+                f"*Urgency:* {ticket.urgency_score:.2f}\n"
+                f"*Assigned to:* {agent_id}\n"
+                f"*Text:* {ticket.text[:200]}"
             )
 
-    finally:
-        # Lock is intentionally left to expire naturally (idempotency window).
-        # Remove it only if you want immediate reprocessability.
-        pass
+# ── Local lock cache ──────────────────────────────────────────────────────────
+# Ticket ids this process locked recently, mapped to when their Redis lock
+# expires (loop time). A redelivered id still inside its window is skipped
+# without a SETNX round-trip; Redis remains the cross-process authority.
+_recent_locks: OrderedDict[str, float] = OrderedDict()
+
+def _locked_locally(tid: str, now: float) -> bool:
+    expires = _recent_locks.get(tid)
+    if expires is None:
+        return False
+    if expires <= now:
+        del _recent_locks[tid]
+        return False
+    return True
+
+def _remember_lock(tid: str, now: float) -> None:
+    _recent_locks[tid] = now + REDIS_LOCK_TTL_SECONDS
+    _recent_locks.move_to_end(tid)
+    if len(_recent_locks) > LOCK_CACHE_MAX:
+        _recent_locks.popitem(last=False)
+
+async def _process_batch(raws: list[bytes], redis: aioredis.Redis) -> None:
+    """
+    Full processing pipeline for a batch of tickets popped in one BLMPOP:
+    1. Unpack MessagePack payloads
+    2. Acquire atomic lock (SETNX) per ticket to prevent duplicate processing
+       (ids this process locked within the TTL are skipped without a round-trip)
+    3. Phase 3: Storm short-circuit check
+    4. Classify + urgency score (with circuit breaker tracking)
+    5. Enqueue + jointly assign agents
+    6. Fire webhook if urgency > threshold
+    Locks are intentionally left to expire naturally (idempotency window).
+    """
+    now = asyncio.get_running_loop().time()
+    entries = []
+    for raw in raws:
+        # A malformed entry (e.g. a pre-MessagePack JSON payload) only costs
+        # itself, not the rest of the popped batch.
+        try:
+            tid, text = unpack_id_text(raw)
+        except Exception as e:
+            log.error("❌ Undecodable ticket payload skipped: %s", e)
+            continue
+        if _locked_locally(tid, now):
+            log.info("🔒 Duplicate skipped: %s", tid)
+            continue
+        entries.append((tid, text))
+
+    if not entries:
+        return
+
+    # ── Atomic locks (SETNX), one pipelined round-trip for the whole batch ────
+    async with redis.pipeline(transaction=False) as pipe:
+        for tid, _ in entries:
+            pipe.set(f"ticket:{tid}:lock", "1", nx=True, ex=REDIS_LOCK_TTL_SECONDS)
+        acquired = await pipe.execute()
+
+    debug = log.isEnabledFor(logging.DEBUG)
+    to_route: list[tuple[str, str]] = []
+    storm_tickets: list[Ticket] = []
+    # Read the clock after the lock round-trip: with several consumers, a
+    # reading taken before an await could be older than timestamps another
+    # batch already recorded, breaking the sorted order the storm window's
+    # binary search relies on. No await between here and check_storm_window.
+    now_ns = int(asyncio.get_running_loop().time() * 1_000_000_000)
+    for (tid, text), ok in zip(entries, acquired):
+        if not ok:
+            log.info("🔒 Duplicate skipped: %s", tid)
+            continue
+        _remember_lock(tid, now)
+
+        if debug:
+            log.debug("🎫 Processing ticket %s", tid)
+
+        # ── Phase 3: Storm short-circuit ──────────────────────────────────────
+        if check_storm_window(now_ns=now_ns):
+            storm_tickets.append(Ticket(id=tid, text=text))  # Skip individual routing
+        else:
+            to_route.append((tid, text))
+
+    for ticket in storm_tickets:
+        _handle_storm(ticket)
+
+    await _route_tickets(to_route)
 
 # ── Main Worker Loop ──────────────────────────────────────────────────────────
 
+async def _consumer(batches: asyncio.Queue, redis: aioredis.Redis) -> None:
+    """Long-lived pool member: processes popped batches one at a time."""
+    while True:
+        raws = await batches.get()
+        try:
+            await _process_batch(raws, redis)
+        except Exception as e:
+            log.error("❌ Batch processing failed: %s", e)
+        finally:
+            batches.task_done()
+
 async def run_worker() -> None:
     """
-    Connect to Redis and run an infinite BLPOP loop.
-    BLPOP blocks until a ticket arrives — zero CPU spin when idle.
+    Connect to Redis and run an infinite BLMPOP loop.
+    BLMPOP blocks until tickets arrive — zero CPU spin when idle — and drains
+    up to WORKER_BATCH_SIZE of them per round-trip.
+    Popped batches go to a fixed pool of WORKER_CONCURRENCY consumers through
+    a bounded queue, so a storm cannot spawn unbounded tasks: once the pool is
+    saturated the loop stops popping and tickets wait in Redis.
     Multiple worker instances can run in parallel; SETNX prevents double processing.
     """
-    redis = aioredis.from_url(REDIS_URL, decode_responses=True)
-    print(f"👷 Worker started — listening on {REDIS_QUEUE_KEY}")
+    _start_logging()
+    # Blocking pool sized for every consumer plus the BLMPOP connection, so
+    # the cap throttles callers instead of failing them.
+    pool = aioredis.BlockingConnectionPool.from_url(  # bytes in/out: payloads are MessagePack
+        REDIS_URL,
+        max_connections=max(REDIS_MAX_CONNECTIONS, WORKER_CONCURRENCY + 1),
+        timeout=REDIS_POOL_TIMEOUT_SECONDS,
+        health_check_interval=REDIS_HEALTH_CHECK_INTERVAL,
+        socket_keepalive=True,
+    )
+    redis = aioredis.Redis.from_pool(pool)
+    _get_http_client()
+
+    # Room for one batch in hand per consumer, so a consumer that finishes
+    # never has to wait on a BLMPOP round-trip for its next batch.
+    batches: asyncio.Queue = asyncio.Queue(maxsize=WORKER_CONCURRENCY * 2)
+    consumers = [
+        asyncio.create_task(_consumer(batches, redis)) for _ in range(WORKER_CONCURRENCY)
+    ]
+    log.info("👷 Worker started — listening on %s (%d consumers)", REDIS_QUEUE_KEY, WORKER_CONCURRENCY)
+
+    # As PID 1 in a container SIGTERM is otherwise ignored; cancelling the
+    # loop task runs the graceful shutdown below before Docker's SIGKILL.
+    loop = asyncio.get_running_loop()
+    try:
+        loop.add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    except (NotImplementedError, RuntimeError):
+        pass  # no loop signal handlers on Windows / outside the main thread
+
+    in_hand: list[bytes] = []   # popped but not yet accepted by the pool queue
+    try:
+        while True:
+            try:
+                result = await redis.blmpop(
+                    5, 1, REDIS_QUEUE_KEY, direction="LEFT", count=WORKER_BATCH_SIZE
+                )
+                if result is None:
+                    continue  # timeout — loop again
+                _, in_hand = result
+                await batches.put(in_hand)  # blocks while every consumer is busy
+                in_hand = []
+
+            except aioredis.ConnectionError as e:
+                log.error("❌ Redis connection lost: %s. Retrying in 3s…", e)
+                await asyncio.sleep(3)
+            except Exception as e:
+                log.error("❌ Unexpected error in worker loop: %s", e)
+                await asyncio.sleep(1)
+    finally:
+        # BLMPOP has stopped. Batches no consumer has started were never
+        # locked, so hand them back to Redis; in-flight ones get a grace period.
+        unstarted: list[bytes] = []
+        while not batches.empty():
+            unstarted.extend(batches.get_nowait())
+            batches.task_done()
+        unstarted.extend(in_hand)   # popped after everything already queued
+        if unstarted:
+            try:
+                # LPUSH reversed so they are the next entries BLMPOP pops, in order
+                await redis.lpush(REDIS_QUEUE_KEY, *reversed(unstarted))
+                log.info("↩️  Re-queued %d unstarted tickets", len(unstarted))
+            except Exception as e:
+                log.error("❌ Could not re-queue %d tickets: %s", len(unstarted), e)
 
-    while True:
         try:
-            result = await redis.blpop(REDIS_QUEUE_KEY, timeout=5)
-            if result is None:
-                continue  # timeout — loop again
-            _, raw = result
-            # Process each ticket as a separate task so the loop never blocks
-            asyncio.create_task(_process_ticket(raw, redis))
-
-        except aioredis.ConnectionError as e:
-            print(f"❌ Redis connection lost: {e}. Retrying in 3s…")
-            await asyncio.sleep(3)
-        except Exception as e:
-            print(f"❌ Unexpected error in worker loop: {e}")
-            await asyncio.sleep(1)
+            await asyncio.wait_for(batches.join(), WORKER_SHUTDOWN_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            log.warning("⚠️  In-flight batches still running after %ss; cancelling",
+                        WORKER_SHUTDOWN_TIMEOUT_SECONDS)
+
+        for task in consumers:
+            task.cancel()
+        try:
+            loop.remove_signal_handler(signal.SIGTERM)
+        except (NotImplementedError, RuntimeError):
+            pass
+        await asyncio.gather(*_background_tasks, return_exceptions=True)
+        await _close_http_client()
+        _stop_logging()
 
 if __name__ == "__main__":
-    asyncio.run(run_worker())
+    try:
+        import uvloop
+    except ImportError:
+        uvloop = None
+
+    try:
+        if uvloop is None:
+            asyncio.run(run_worker())  # default asyncio loop (e.g. on Windows)
+        else:
+            # uvloop.run passes the loop factory to asyncio.Runner instead of
+            # replacing the global policy (uvloop.install is deprecated on 3.12+).
+            uvloop.run(run_worker())
+    except asyncio.CancelledError:
+        pass  # SIGTERM: shutdown already ran in run_worker's finally